@@ -157,6 +157,14 @@ class KeyValueBasedFilterExpression(FilterExpression):
         self._key = key
         self._expected_value = expected_value
 
+    @property
+    def key(self) -> List[str]:
+        return self._key
+
+    @property
+    def expected_value(self) -> Any:
+        return self._expected_value
+
     def __repr__(self) -> str:
         return "{}:{}".format(self._as_dotted_string(self._key), str(self._expected_value))
 
@@ -88,6 +88,8 @@ class Pipeline:
         self._create_connectors()
 
     def _build_pipeline(self):
+        if self._pipeline:
+            return
         if self._logger.isEnabledFor(DEBUG):
             self._logger.debug(f"Building '{current_process().name}'")
         self._pipeline = []
@@ -368,6 +370,11 @@ class MultiprocessingPipeline(Process, Pipeline):
         with self._continue_iterating.get_lock():
             self._continue_iterating.value = False
 
+        # Build the processors in the parent process so rule trees and compiled patterns are
+        # inherited by the forked workers via copy-on-write instead of being rebuilt per worker.
+        self._create_logger()
+        self._build_pipeline()
+
         Process.__init__(self)
 
     def run(self):
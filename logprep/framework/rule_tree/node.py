@@ -4,11 +4,16 @@ from typing import Optional, List
 
 from logprep.filter.expression.filter_expression import FilterExpression
 from logprep.filter.expression.filter_expression import KeyDoesNotExistError
+from logprep.filter.expression.filter_expression import StringFilterExpression
+
+_MISSING = object()
 
 
 class Node:
     """Tree node for rule tree model."""
 
+    MIN_INDEXED_CHILDREN = 4
+
     def __init__(self, expression: FilterExpression):
         """Node initialization function.
 
@@ -23,6 +28,8 @@ class Node:
         """
         self._expression = expression
         self._children = []
+        self._child_index = None
+        self._match_cache_key = None
         self.matching_rules = []
 
     def does_match(self, event: dict):
@@ -62,6 +69,68 @@ class Node:
 
         """
         self._children.append(node)
+        self._child_index = None
+
+    def get_match_candidates(self, event: dict) -> List["Node"]:
+        """Get the children of this node that can still match the given event.
+
+        Nodes with many children carrying string filter expressions on the same field occur in
+        rule sets that fan out on a discriminator field like an event id. Instead of evaluating
+        each of those children against the event, the children are indexed by their expected
+        value once, the field value is read once per event and the single child that can match
+        is looked up directly. All other children are returned unfiltered, in their original
+        order, so the resulting rule order does not change.
+        """
+        child_index = self._child_index
+        if child_index is None:
+            child_index = self._create_child_index()
+        if not child_index:
+            return self._children
+        excluded = set()
+        for key, (value_map, indexed_ids) in child_index.items():
+            value = event
+            for sub_field in key:
+                if isinstance(value, dict) and sub_field in value:
+                    value = value[sub_field]
+                else:
+                    value = _MISSING
+                    break
+            if value is _MISSING:
+                excluded.update(indexed_ids)
+                continue
+            if isinstance(value, (dict, list)):
+                continue
+            matching_child = value_map.get(str(value))
+            excluded.update(indexed_ids - {id(matching_child)})
+        if not excluded:
+            return self._children
+        return [child for child in self._children if id(child) not in excluded]
+
+    def _create_child_index(self) -> dict:
+        """Index children with string filter expressions by their field and expected value.
+
+        This is an inverted index over the atomic equality predicates of the children: rule
+        dispatch per field becomes one event lookup instead of one evaluation per child. Only
+        string filter expressions are indexed, since other expression types either have no
+        exact expected value (sigma, wildcard, regex) or already cost no more than the lookup
+        itself (an exists check is a single path walk). Only fields checked by at least
+        MIN_INDEXED_CHILDREN children are indexed, since the index does not pay off for small
+        fan-outs.
+        """
+        by_key = {}
+        for child in self._children:
+            expression = child.expression
+            if type(expression) is StringFilterExpression:  # pylint: disable=C0123
+                by_key.setdefault(tuple(expression.key), []).append(child)
+        self._child_index = {
+            key: (
+                {child.expression.expected_value: child for child in children},
+                {id(child) for child in children},
+            )
+            for key, children in by_key.items()
+            if len(children) >= Node.MIN_INDEXED_CHILDREN
+        }
+        return self._child_index
 
     def has_child_with_expression(self, expression: FilterExpression) -> Optional["Node"]:
         """Check if node has child with given expression.
@@ -105,6 +174,19 @@ class Node:
 
         return None
 
+    @property
+    def match_cache_key(self) -> str:
+        """Key identifying this node's expression for per-event match result caching.
+
+        Equal expressions produce equal keys, even across different trees, so a match result
+        cached for one node can be reused for every node carrying an equal expression. The
+        expression type is part of the key since expressions of different types can share a
+        representation but match differently.
+        """
+        if self._match_cache_key is None:
+            self._match_cache_key = f"{type(self._expression).__name__}:{self._expression!r}"
+        return self._match_cache_key
+
     @property
     def expression(self) -> FilterExpression:
         return self._expression
@@ -5,6 +5,7 @@ from json import load
 
 from logging import Logger
 
+from logprep.filter.expression.filter_expression import Always, Exists
 from logprep.processor.base.rule import Rule
 
 from logprep.framework.rule_tree.node import Node
@@ -14,6 +15,8 @@ from logprep.framework.rule_tree.rule_parser import RuleParser
 class RuleTree:
     """Represent a set of rules using a rule tree model."""
 
+    MATCHING_RULES_CACHE_SIZE = 1024
+
     def __init__(self, root: Node = None, config_path: str = None):
         """Rule tree initialization function.
 
@@ -31,6 +34,8 @@ class RuleTree:
         """
         self.rule_counter = 0
         self._rule_mapping = {}
+        self._shape_based_matching = True
+        self._matching_rules_cache = {}
         self._config_path = config_path
         self._setup()
 
@@ -87,9 +92,25 @@ class RuleTree:
         for parsed_rule in parsed_rule_list:
             end_node = self._add_parsed_rule(parsed_rule)
             end_node.matching_rules.append(rule)
+            for expression in parsed_rule:
+                if not RuleTree._expression_matches_by_top_level_keys(expression):
+                    self._shape_based_matching = False
+        self._matching_rules_cache.clear()
 
         self._rule_mapping[rule] = self.rule_counter - 1
 
+    @staticmethod
+    def _expression_matches_by_top_level_keys(expression) -> bool:
+        """Check if the match result of an expression depends only on the top level key set.
+
+        Only existence checks of top level fields qualify. Any expression that inspects field
+        values or deeper paths can give different results for events with identical top level
+        keys, which would make shape based memoization of matching rules unsound.
+        """
+        if isinstance(expression, Always):
+            return True
+        return isinstance(expression, Exists) and len(expression.split_field) == 1
+
     def _add_parsed_rule(self, parsed_rule: list):
         """Add parsed rule to rule tree.
 
@@ -145,7 +166,11 @@ class RuleTree:
         return self._rule_mapping[rule]
 
     def get_matching_rules(
-        self, event: dict, current_node: Node = None, matches: List[Rule] = None
+        self,
+        event: dict,
+        current_node: Node = None,
+        matches: List[Rule] = None,
+        expression_cache: dict = None,
     ) -> list:
         """Get all rules in the tree that match given event.
 
@@ -166,6 +191,9 @@ class RuleTree:
             Tree node that is currently investigated in recursive matching process.
         matches: List[Rule]
             List of matching rules that is extended in recursive matching process.
+        expression_cache: dict, optional
+            Cache of match results per expression for the current event. Passing the same dict
+            for several trees lets equal expressions be evaluated only once per event.
 
         Returns
         -------
@@ -174,20 +202,45 @@ class RuleTree:
 
         """
         if not current_node:
+            if self._shape_based_matching:
+                return self._get_matching_rules_memoized(event)
             current_node = self._root
             matches = []
 
-        for child in current_node.children:
-            if child.does_match(event):
+        for child in current_node.get_match_candidates(event):
+            if expression_cache is None:
+                does_match = child.does_match(event)
+            else:
+                does_match = expression_cache.get(child.match_cache_key)
+                if does_match is None:
+                    does_match = child.does_match(event)
+                    expression_cache[child.match_cache_key] = does_match
+
+            if does_match:
                 current_node = child
 
                 if current_node.matching_rules:
                     matches += child.matching_rules
 
-                self.get_matching_rules(event, current_node, matches)
+                self.get_matching_rules(event, current_node, matches, expression_cache)
 
         return matches
 
+    def _get_matching_rules_memoized(self, event: dict) -> list:
+        """Get all matching rules for an event, memoized by the event's top level key set.
+
+        This is only used while every expression in the tree matches by top level key existence
+        alone, so events with the same top level keys are guaranteed to match the same rules.
+        The cache is dropped whenever a rule is added and its size is capped.
+        """
+        shape = frozenset(event.keys())
+        cached_matches = self._matching_rules_cache.get(shape)
+        if cached_matches is None:
+            cached_matches = tuple(self.get_matching_rules(event, self._root, []))
+            if len(self._matching_rules_cache) < RuleTree.MATCHING_RULES_CACHE_SIZE:
+                self._matching_rules_cache[shape] = cached_matches
+        return list(cached_matches)
+
     def print(self, current_node: Node = None, depth: int = 1):
         """Print rule tree to console.
 
@@ -192,10 +192,7 @@ class RuleBasedProcessor(BaseProcessor):
             for file_name in [
                 file
                 for file in files
-                if (
-                    (file.endswith(".json") or file.endswith(".yml"))
-                    and not file.endswith("_test.json")
-                )
+                if file.endswith((".json", ".yml")) and not file.endswith("_test.json")
             ]:
                 valid_file_paths.append(path.join(root, file_name))
         return valid_file_paths
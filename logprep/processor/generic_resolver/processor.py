@@ -8,9 +8,12 @@ from os.path import isdir, realpath, join
 
 from multiprocessing import current_process
 
-import re
+from yaml import load, YAMLError
 
-from ruamel.yaml import YAML
+try:
+    from yaml import CSafeLoader as SafeLoader
+except ImportError:  # pragma: no cover
+    from yaml import SafeLoader
 
 from logprep.processor.base.processor import RuleBasedProcessor
 from logprep.processor.generic_resolver.rule import GenericResolverRule
@@ -23,8 +26,6 @@ from logprep.processor.base.exceptions import (
 from logprep.util.processor_stats import ProcessorStats
 from logprep.util.time_measurement import TimeMeasurement
 
-yaml = YAML(typ="safe", pure=True)
-
 
 class GenericResolverError(BaseException):
     """Base class for GenericResolver related exceptions."""
@@ -53,6 +54,7 @@ class GenericResolver(RuleBasedProcessor):
         self.ps = ProcessorStats()
 
         self._replacements_from_file = {}
+        self._src_val_cache = {}
 
     # pylint: disable=arguments-differ
     def add_rules_from_directory(self, rule_paths: List[str]):
@@ -62,16 +64,20 @@ class GenericResolver(RuleBasedProcessor):
                 raise NotARulesDirectoryError(self._name, path)
 
             for root, _, files in walk(path):
-                json_files = []
-                for file in files:
-                    if (file.endswith(".json") or file.endswith(".yml")) and not file.endswith(
-                        "_test.json"
-                    ):
-                        json_files.append(file)
+                json_files = [
+                    file
+                    for file in files
+                    if file.endswith((".json", ".yml")) and not file.endswith("_test.json")
+                ]
                 for file in json_files:
                     rules = self._load_rules_from_file(join(root, file))
                     for rule in rules:
                         self._tree.add_rule(rule, self._logger)
+                        if rule.resolve_from_file:
+                            try:
+                                self._load_mapping_from_file(rule)
+                            except (GenericResolverError, YAMLError) as error:
+                                self._logger.warning(str(error))
 
         if self._logger.isEnabledFor(DEBUG):
             self._logger.debug(
@@ -95,49 +101,67 @@ class GenericResolver(RuleBasedProcessor):
     @TimeMeasurement.measure_time("generic_resolver")
     def process(self, event: dict):
         self._event = event
+        self._src_val_cache = {}
 
+        sample_timing = self.ps.sample_rule_timing()
         for rule in self._tree.get_matching_rules(event):
-            begin = time()
-            self._apply_rules(event, rule)
-            processing_time = float("{:.10f}".format(time() - begin))
-            idx = self._tree.get_rule_id(rule)
-            self.ps.update_per_rule(idx, processing_time)
-
+            if sample_timing:
+                begin = time()
+                self._apply_rules(event, rule)
+                processing_time = time() - begin
+                self.ps.update_rule_timing(self._tree.get_rule_id(rule), processing_time)
+            else:
+                self._apply_rules(event, rule)
+            self.ps.update_match_count(self._tree.get_rule_id(rule))
+
+        self._src_val_cache = {}
         self.ps.increment_processed_count()
 
+    def _load_mapping_from_file(self, rule):
+        """Load the resolve_from_file mapping of a rule if it has not been loaded yet.
+
+        Called at rule-load time so the file I/O and YAML parsing don't delay the first event
+        matching the rule, and again from _apply_rules so a failed preload surfaces as a
+        processing error.
+        """
+        if rule.resolve_from_file["path"] in self._replacements_from_file:
+            return
+        try:
+            with open(rule.resolve_from_file["path"], "r") as add_file:
+                add_dict = load(add_file, Loader=SafeLoader)
+                if isinstance(add_dict, dict) and all(
+                    isinstance(value, str) for value in add_dict.values()
+                ):
+                    self._replacements_from_file[rule.resolve_from_file["path"]] = add_dict
+                else:
+                    raise GenericResolverError(
+                        self._name,
+                        f"Additions file "
+                        f'\'{rule.resolve_from_file["path"]}\''
+                        f" must be a dictionary with string values!",
+                    )
+        except FileNotFoundError as error:
+            raise GenericResolverError(
+                self._name,
+                f'Additions file \'{rule.resolve_from_file["path"]}' f"' not found!",
+            ) from error
+
     def _apply_rules(self, event, rule):
         conflicting_fields = list()
 
         if rule.resolve_from_file:
-            if rule.resolve_from_file["path"] not in self._replacements_from_file:
-                try:
-                    with open(rule.resolve_from_file["path"], "r") as add_file:
-                        add_dict = yaml.load(add_file)
-                        if isinstance(add_dict, dict) and all(
-                            isinstance(value, str) for value in add_dict.values()
-                        ):
-                            self._replacements_from_file[rule.resolve_from_file["path"]] = add_dict
-                        else:
-                            raise GenericResolverError(
-                                self._name,
-                                f"Additions file "
-                                f'\'{rule.resolve_from_file["path"]}\''
-                                f" must be a dictionary with string values!",
-                            )
-                except FileNotFoundError as error:
-                    raise GenericResolverError(
-                        self._name,
-                        f'Additions file \'{rule.resolve_from_file["path"]}' f"' not found!",
-                    ) from error
+            self._load_mapping_from_file(rule)
 
-        for resolve_source, resolve_target in rule.field_mapping.items():
-            keys = resolve_target.split(".")
-            src_val = self._get_dotted_field_value(event, resolve_source)
+        for resolve_source, from_file_setter, resolve_list_setter in rule.resolve_setters:
+            if resolve_source in self._src_val_cache:
+                src_val = self._src_val_cache[resolve_source]
+            else:
+                src_val = self._get_dotted_field_value(event, resolve_source)
+                self._src_val_cache[resolve_source] = src_val
 
             if rule.resolve_from_file and src_val:
-                pattern = f'^{rule.resolve_from_file["pattern"]}$'
                 replacements = self._replacements_from_file[rule.resolve_from_file["path"]]
-                matches = re.match(pattern, src_val)
+                matches = rule.compiled_from_file_pattern.match(src_val)
                 if matches:
                     try:
                         dest_val = replacements.get(matches.group("mapping"))
@@ -146,45 +170,55 @@ class GenericResolver(RuleBasedProcessor):
                             self._name, "Mapping group is missing in mapping file " "pattern!"
                         ) from error
                     if dest_val:
-                        dict_ = event
-                        for idx, key in enumerate(keys):
-                            if key not in dict_:
-                                if idx == len(keys) - 1:
-                                    if rule.append_to_list:
-                                        dict_[key] = dict_.get("key", [])
-                                        if dest_val not in dict_[key]:
-                                            dict_[key].append(dest_val)
-                                    else:
-                                        dict_[key] = dest_val
-                                    break
-                                dict_[key] = dict()
-                            if isinstance(dict_[key], dict):
-                                dict_ = dict_[key]
-                            else:
-                                if rule.append_to_list and isinstance(dict_[key], list):
-                                    if dest_val not in dict_[key]:
-                                        dict_[key].append(dest_val)
-                                else:
-                                    conflicting_fields.append(keys[idx])
-
-            for pattern, dest_val in rule.resolve_list.items():
-                if src_val and re.search(pattern, src_val):
-                    dict_ = event
-                    for idx, key in enumerate(keys):
-                        if key not in dict_:
-                            if idx == len(keys) - 1:
-                                if rule.append_to_list:
-                                    dict_[key] = dict_.get("key", [])
-                                    dict_[key].append(dest_val)
-                                else:
-                                    dict_[key] = dest_val
-                                break
-                            dict_[key] = dict()
-                        if isinstance(dict_[key], dict):
-                            dict_ = dict_[key]
-                        else:
-                            conflicting_fields.append(keys[idx])
-                    break
+                        from_file_setter(event, dest_val, conflicting_fields)
+                        # The write may change what later rules read from the target field,
+                        # so its cached source value must not be reused
+                        self._src_val_cache.pop(rule.field_mapping[resolve_source], None)
+
+            if src_val and rule.compiled_resolve_list:
+                dest_val = self._get_first_resolve_list_match(rule, src_val)
+                if dest_val is not None:
+                    resolve_list_setter(event, dest_val, conflicting_fields)
+                    self._src_val_cache.pop(rule.field_mapping[resolve_source], None)
 
         if conflicting_fields:
             raise DuplicationError(self._name, conflicting_fields)
+
+    @staticmethod
+    def _get_first_resolve_list_match(rule, src_val):
+        """Get the resolved value of the first resolve_list pattern matching the source value.
+
+        Resolve lists consisting only of literal patterns are matched with substring
+        containment instead of the regex engine.
+
+        If the rule has a combined pattern, its leftmost match yields the index of one matching
+        pattern, so only patterns with a lower index have to be checked to find the first match.
+        A leftmost match on the first pattern resolves without any further scans.
+        """
+        literal_resolve_list = rule.literal_resolve_list
+        if literal_resolve_list is not None:
+            if len(src_val) < rule.min_literal_length:
+                return None
+            if rule.ignore_case:
+                src_val = src_val.lower()
+            for literal, dest_val in literal_resolve_list:
+                if literal in src_val:
+                    return dest_val
+            return None
+        combined_pattern = rule.combined_resolve_pattern
+        if combined_pattern is not None:
+            combined_match = combined_pattern.search(src_val)
+            if combined_match is None:
+                for _, pattern, dest_val in rule.fallback_resolve_list:
+                    if pattern.search(src_val):
+                        return dest_val
+                return None
+            match_index = int(combined_match.lastgroup[1:])
+            for pattern, dest_val in rule.compiled_resolve_list[:match_index]:
+                if pattern.search(src_val):
+                    return dest_val
+            return rule.compiled_resolve_list[match_index][1]
+        for pattern, dest_val in rule.compiled_resolve_list:
+            if pattern.search(src_val):
+                return dest_val
+        return None
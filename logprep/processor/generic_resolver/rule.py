@@ -1,10 +1,123 @@
 """This module is used to resolve field values from documents via a list."""
 
+import re
+
 from logprep.filter.expression.filter_expression import FilterExpression
 
 from logprep.processor.base.rule import Rule, InvalidRuleDefinitionError
 
 
+def _create_resolve_list_setter(keys: tuple, append_to_list: bool):
+    """Create a setter writing a resolved value to the target field of an event.
+
+    The key path and the append behavior are baked into the returned function at rule-load time,
+    so applying a rule doesn't have to dispatch on them per event. Fields that already exist with
+    a non-dict value are added to the passed conflicting fields list. Rules with a non-dotted
+    target (the common case) get a specialized setter without the key walk.
+    """
+    if len(keys) == 1:
+        key = keys[0]
+
+        if append_to_list:
+
+            def _flat_append_setter(event: dict, dest_val, conflicting_fields: list):
+                if key not in event:
+                    event[key] = event.get("key", [])
+                    event[key].append(dest_val)
+                elif not isinstance(event[key], dict):
+                    conflicting_fields.append(key)
+
+            return _flat_append_setter
+
+        def _flat_setter(event: dict, dest_val, conflicting_fields: list):
+            if key not in event:
+                event[key] = dest_val
+            elif not isinstance(event[key], dict):
+                conflicting_fields.append(key)
+
+        return _flat_setter
+
+    last_index = len(keys) - 1
+
+    def _setter(event: dict, dest_val, conflicting_fields: list):
+        dict_ = event
+        for idx, key in enumerate(keys):
+            if key not in dict_:
+                if idx == last_index:
+                    if append_to_list:
+                        dict_[key] = dict_.get("key", [])
+                        dict_[key].append(dest_val)
+                    else:
+                        dict_[key] = dest_val
+                    break
+                dict_[key] = dict()
+            if isinstance(dict_[key], dict):
+                dict_ = dict_[key]
+            else:
+                conflicting_fields.append(key)
+
+    return _setter
+
+
+def _create_resolve_from_file_setter(keys: tuple, append_to_list: bool):
+    """Create a setter writing a value resolved from file to the target field of an event.
+
+    Like the resolve_list setter, but values resolved from file are only appended to existing
+    lists if they are not contained yet.
+    """
+    if len(keys) == 1:
+        key = keys[0]
+
+        if append_to_list:
+
+            def _flat_append_setter(event: dict, dest_val, conflicting_fields: list):
+                if key not in event:
+                    event[key] = event.get("key", [])
+                    if dest_val not in event[key]:
+                        event[key].append(dest_val)
+                elif isinstance(event[key], list):
+                    if dest_val not in event[key]:
+                        event[key].append(dest_val)
+                elif not isinstance(event[key], dict):
+                    conflicting_fields.append(key)
+
+            return _flat_append_setter
+
+        def _flat_setter(event: dict, dest_val, conflicting_fields: list):
+            if key not in event:
+                event[key] = dest_val
+            elif not isinstance(event[key], dict):
+                conflicting_fields.append(key)
+
+        return _flat_setter
+
+    last_index = len(keys) - 1
+
+    def _setter(event: dict, dest_val, conflicting_fields: list):
+        dict_ = event
+        for idx, key in enumerate(keys):
+            if key not in dict_:
+                if idx == last_index:
+                    if append_to_list:
+                        dict_[key] = dict_.get("key", [])
+                        if dest_val not in dict_[key]:
+                            dict_[key].append(dest_val)
+                    else:
+                        dict_[key] = dest_val
+                    break
+                dict_[key] = dict()
+            if isinstance(dict_[key], dict):
+                dict_ = dict_[key]
+            else:
+                if append_to_list and isinstance(dict_[key], list):
+                    if dest_val not in dict_[key]:
+                        dict_[key].append(dest_val)
+                else:
+                    conflicting_fields.append(key)
+
+    return _setter
+
+
 class GenericResolverRuleError(InvalidRuleDefinitionError):
     """Base class for GenericResolver rule related exceptions."""
 
@@ -23,6 +136,8 @@ class InvalidGenericResolverDefinition(GenericResolverRuleError):
 class GenericResolverRule(Rule):
     """Check if documents match a filter."""
 
+    _combined_pattern_cache = {}
+
     def __init__(self, filter_rule: FilterExpression, generic_resolver_cfg: dict):
         super().__init__(filter_rule)
 
@@ -30,6 +145,103 @@ class GenericResolverRule(Rule):
         self._resolve_list = generic_resolver_cfg.get("resolve_list", {})
         self._resolve_from_file = generic_resolver_cfg.get("resolve_from_file", {})
         self._append_to_list = generic_resolver_cfg.get("append_to_list", False)
+        self._ignore_case = generic_resolver_cfg.get("ignore_case", False)
+
+        pattern_flags = re.IGNORECASE if self._ignore_case else 0
+        self._field_mapping_split = [
+            (resolve_source, tuple(resolve_target.split(".")))
+            for resolve_source, resolve_target in self._field_mapping.items()
+        ]
+        self._compiled_resolve_list = [
+            (re.compile(pattern, pattern_flags), resolved)
+            for pattern, resolved in self._resolve_list.items()
+        ]
+        self._compiled_from_file_pattern = (
+            re.compile(f'^{self._resolve_from_file["pattern"]}$', pattern_flags)
+            if self._resolve_from_file
+            else None
+        )
+        self._literal_resolve_list = self._create_literal_resolve_list()
+        self._min_literal_length = (
+            min(len(literal) for literal, _ in self._literal_resolve_list)
+            if self._literal_resolve_list
+            else 0
+        )
+        (
+            self._combined_resolve_pattern,
+            self._fallback_resolve_list,
+        ) = self._compile_combined_resolve_pattern()
+        self._resolve_setters = [
+            (
+                resolve_source,
+                _create_resolve_from_file_setter(keys, self._append_to_list),
+                _create_resolve_list_setter(keys, self._append_to_list),
+            )
+            for resolve_source, keys in self._field_mapping_split
+        ]
+
+    def _create_literal_resolve_list(self):
+        """Create a literal resolve list if no resolve_list pattern contains regex syntax.
+
+        Pure literal patterns can be matched with substring containment, which is cheaper than
+        running the regex engine. Returns None if any pattern is a real regex.
+        """
+        if not self._resolve_list:
+            return None
+        literals = []
+        for pattern, resolved in self._resolve_list.items():
+            if re.escape(pattern) != pattern:
+                return None
+            literals.append((pattern.lower() if self._ignore_case else pattern, resolved))
+        return literals
+
+    def _compile_combined_resolve_pattern(self):
+        """Compile all combinable resolve_list patterns into a single alternation pattern.
+
+        The combined pattern allows checking all combinable patterns of this rule with one scan
+        over the source value. Patterns with capturing groups can't be merged without changing
+        their group numbering; those are kept on a fallback list of
+        (pattern index, compiled pattern, resolved value) triples that gets scanned pattern by
+        pattern.
+
+        Rule files are often duplicated across rule directories, so compiled combined patterns
+        are shared between rules with identical resolve list patterns. Only the combined pattern
+        and the fallback pattern indices are shared, since rules can map the same patterns to
+        different resolved values; the fallback values are always taken from this rule's own
+        compiled resolve list.
+        """
+        if not self._compiled_resolve_list:
+            return None, []
+        cache_key = (self._ignore_case, tuple(self._resolve_list))
+        if cache_key in GenericResolverRule._combined_pattern_cache:
+            combined_pattern, fallback_indices = GenericResolverRule._combined_pattern_cache[
+                cache_key
+            ]
+        else:
+            combinable = []
+            fallback_indices = []
+            for index, (compiled, _) in enumerate(self._compiled_resolve_list):
+                if compiled.groups:
+                    fallback_indices.append(index)
+                else:
+                    combinable.append((index, compiled.pattern))
+            combined_pattern = None
+            if combinable:
+                combined = "|".join(f"(?P<g{index}>{pattern})" for index, pattern in combinable)
+                try:
+                    combined_pattern = re.compile(
+                        combined, re.IGNORECASE if self._ignore_case else 0
+                    )
+                except re.error:
+                    combined_pattern = None
+            if combined_pattern is None:
+                fallback_indices = list(range(len(self._compiled_resolve_list)))
+            GenericResolverRule._combined_pattern_cache[cache_key] = (
+                combined_pattern,
+                fallback_indices,
+            )
+        fallback = [(index,) + self._compiled_resolve_list[index] for index in fallback_indices]
+        return combined_pattern, fallback
 
     def __eq__(self, other: "GenericResolverRule") -> bool:
         return (
@@ -37,6 +249,7 @@ class GenericResolverRule(Rule):
             and (self._field_mapping == other.field_mapping)
             and (self._resolve_list == other.resolve_list)
             and (self._append_to_list == other.append_to_list)
+            and (self._ignore_case == other.ignore_case)
         )
 
     def __hash__(self) -> int:
@@ -47,6 +260,14 @@ class GenericResolverRule(Rule):
     def field_mapping(self) -> dict:
         return self._field_mapping
 
+    @property
+    def field_mapping_split(self) -> list:
+        return self._field_mapping_split
+
+    @property
+    def resolve_setters(self) -> list:
+        return self._resolve_setters
+
     @property
     def resolve_list(self) -> dict:
         return self._resolve_list
@@ -55,10 +276,38 @@ class GenericResolverRule(Rule):
     def resolve_from_file(self) -> dict:
         return self._resolve_from_file
 
+    @property
+    def compiled_resolve_list(self) -> list:
+        return self._compiled_resolve_list
+
+    @property
+    def compiled_from_file_pattern(self):
+        return self._compiled_from_file_pattern
+
+    @property
+    def combined_resolve_pattern(self):
+        return self._combined_resolve_pattern
+
+    @property
+    def fallback_resolve_list(self) -> list:
+        return self._fallback_resolve_list
+
+    @property
+    def literal_resolve_list(self):
+        return self._literal_resolve_list
+
+    @property
+    def min_literal_length(self) -> int:
+        return self._min_literal_length
+
     @property
     def append_to_list(self) -> bool:
         return self._append_to_list
 
+    @property
+    def ignore_case(self) -> bool:
+        return self._ignore_case
+
     # pylint: enable=C0111
 
     @staticmethod
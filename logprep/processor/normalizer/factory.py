@@ -25,6 +25,7 @@ class NormalizerFactory(BaseFactory):
             configuration.get("html_replace_fields"),
             configuration.get("grok_patterns"),
             configuration.get("count_grok_pattern_matches"),
+            configuration.get("grok_pattern_timeout"),
         )
 
         return normalizer
@@ -3,33 +3,210 @@ import html
 import os
 from typing import Optional, Tuple, List, Union
 from filelock import FileLock
-import json
+import ujson
 from logging import Logger, DEBUG
 from pathlib import Path
 
 from ruamel.yaml import YAML
-from time import time
-from functools import reduce
+from time import sleep, time
+from functools import lru_cache
 from multiprocessing import current_process
+from threading import Lock, Thread
 import re
 
 from datetime import datetime
 from dateutil import parser
-from pytz import timezone
-import arrow
 import calendar
 
-import ujson
+try:
+    # C backed and interpreter-cached timezones, available from Python 3.9 on
+    from zoneinfo import ZoneInfo as _make_timezone
+
+    _pytz_zones = False
+except ImportError:  # pragma: no cover
+    from pytz import timezone as _make_timezone
+
+    _pytz_zones = True
 
 from logprep.framework.rule_tree.rule_tree import RuleTree
-from logprep.processor.base.processor import RuleBasedProcessor, ProcessingWarning
+from logprep.processor.base.processor import (
+    RuleBasedProcessor,
+    ProcessingWarning,
+    ProcessingWarningCollection,
+)
 from logprep.processor.normalizer.exceptions import DuplicationError, NormalizerError
 from logprep.processor.normalizer.rule import NormalizerRule
 
 from logprep.util.processor_stats import ProcessorStats
 from logprep.util.time_measurement import TimeMeasurement
 
-yaml = YAML(typ="safe", pure=True)
+yaml = YAML(typ="safe")
+
+
+@lru_cache(maxsize=None)
+def _load_yaml_file(path: str) -> dict:
+    """Load a YAML mapping file, parsing each file only once per process.
+
+    The regex mapping and HTML replace field files are shared by every normalizer instance
+    and only read after loading, so the parsed mappings can be shared as well.
+    """
+    with open(path, "r") as file:
+        return yaml.load(file)
+
+
+# C implemented fast path for most ISO8601 timestamps, only available from Python 3.7 on
+_parse_isoformat = getattr(datetime, "fromisoformat", None)
+
+_MISSING = object()
+
+_html_entity_pattern = re.compile("&#[0-9]{2,4};")
+
+# Lowercase weekday names resolved once, so building a counter file name needs no
+# locale lookup
+_weekdays = tuple(day.lower() for day in calendar.day_name)
+
+
+def _create_field_getter(fields: tuple):
+    """Create a getter reading a fixed field path from an event with one direct expression.
+
+    Rules address a handful of fixed paths, so the per-level type checks of a generic walk
+    can be specialized away once per path instead of being interpreted once per event.
+    Missing keys and paths crossing a non-dict value surface as KeyError or TypeError and
+    yield None like the generic walk does.
+    """
+    if len(fields) == 1:
+        (field,) = fields
+
+        def _get_value(event):
+            return event.get(field)
+
+    elif len(fields) == 2:
+        first, second = fields
+
+        def _get_value(event):
+            try:
+                return event[first][second]
+            except (KeyError, TypeError):
+                return None
+
+    elif len(fields) == 3:
+        first, second, third = fields
+
+        def _get_value(event):
+            try:
+                return event[first][second][third]
+            except (KeyError, TypeError):
+                return None
+
+    else:
+
+        def _get_value(event):
+            try:
+                for field in fields:
+                    event = event[field]
+                return event
+            except (KeyError, TypeError):
+                return None
+
+    return _get_value
+
+
+@lru_cache(maxsize=64)
+def _get_timezone(name: str):
+    """Get the timezone object for a timezone name, constructing it only once per name."""
+    return _make_timezone(name)
+
+
+def _parse_iso8601_timestamp(source_timestamp: str, _source_timezone, _current_year) -> datetime:
+    if _parse_isoformat is not None:
+        try:
+            return _parse_isoformat(source_timestamp)
+        except ValueError:
+            pass
+    return parser.isoparse(source_timestamp)
+
+
+def _parse_unix_timestamp(source_timestamp: str, source_timezone, _current_year) -> datetime:
+    # convert UNIX Epoch timestamp string to int (with or without milliseconds)
+    new_stamp = int(source_timestamp)
+    if len(source_timestamp) > 10:
+        # Epoch with milliseconds
+        return datetime.fromtimestamp(new_stamp / 1000, source_timezone)
+    # Epoch without milliseconds
+    return datetime.fromtimestamp(new_stamp, source_timezone)
+
+
+def _make_strptime_parser(source_format: str):
+    def _parse(source_timestamp: str, _source_timezone, current_year: int) -> datetime:
+        timestamp = datetime.strptime(source_timestamp, source_format)
+        # Set year to current year if no year was provided in timestamp
+        if timestamp.year == 1900:
+            timestamp = timestamp.replace(year=current_year)
+        return timestamp
+
+    return _parse
+
+
+@lru_cache(maxsize=None)
+def _get_timestamp_parsers(source_formats: Tuple[str, ...]) -> tuple:
+    """Compile a format list into parser callables, compiling each distinct list only once.
+
+    Each parser takes the timestamp string, the source timezone and the current year and
+    raises a ValueError if
+    the string does not have its format, so trying the formats in their configured order needs
+    no per-event inspection of the format strings.
+    """
+    parsers = []
+    for source_format in source_formats:
+        if source_format == "ISO8601":
+            parsers.append(_parse_iso8601_timestamp)
+        elif source_format == "UNIX":
+            parsers.append(_parse_unix_timestamp)
+        else:
+            parsers.append(_make_strptime_parser(source_format))
+    return tuple(parsers)
+
+
+@lru_cache(maxsize=10000)
+def _normalize_timestamp(
+    source_timestamp: str,
+    source_formats: Tuple[str, ...],
+    source_timezone_name: str,
+    destination_timezone_name: str,
+    current_year: int,
+) -> Optional[str]:
+    """Parse a timestamp and convert it into the destination timezone in ISO8601 form.
+
+    Log streams repeat identical timestamps across many events within the same second, so
+    the result is memoized and each distinct combination of timestamp and normalization is
+    only parsed and converted once. The current year is part of the cache key since year-less
+    source formats get the current year substituted, so cached entries must not survive a
+    year rollover. Returns None if no source format matches.
+    """
+    source_timezone = _get_timezone(source_timezone_name)
+    destination_timezone = _get_timezone(destination_timezone_name)
+
+    timestamp = None
+    for parse in _get_timestamp_parsers(source_formats):
+        try:
+            timestamp = parse(source_timestamp, source_timezone, current_year)
+            break
+        except ValueError:
+            timestamp = None
+    if timestamp is None:
+        return None
+
+    if not timestamp.tzinfo:
+        if _pytz_zones:  # pragma: no cover
+            timestamp = source_timezone.localize(timestamp)
+            timestamp = source_timezone.normalize(timestamp)
+        else:
+            timestamp = timestamp.replace(tzinfo=source_timezone)
+    timestamp = timestamp.astimezone(destination_timezone)
+    if _pytz_zones:  # pragma: no cover
+        timestamp = destination_timezone.normalize(timestamp)
+
+    return timestamp.isoformat().replace("+00:00", "Z")
 
 
 class Normalizer(RuleBasedProcessor):
@@ -46,6 +223,7 @@ class Normalizer(RuleBasedProcessor):
         html_replace_fields: str = None,
         grok_patterns: str = None,
         count_grok_pattern_matches: dict = None,
+        grok_pattern_timeout: float = None,
     ):
         super().__init__(name, tree_config, logger)
         self._logger = logger
@@ -54,6 +232,8 @@ class Normalizer(RuleBasedProcessor):
         self._name = name
         self._event = None
         self._conflicting_fields = []
+        self._dotted_field_cache = {}
+        self._field_getter_cache = {}
 
         self._regex_mapping = regex_mapping
         self._html_replace_fields = html_replace_fields
@@ -61,6 +241,8 @@ class Normalizer(RuleBasedProcessor):
         self._specific_tree = RuleTree(config_path=tree_config)
         self._generic_tree = RuleTree(config_path=tree_config)
 
+        self._grok_pattern_timeout = grok_pattern_timeout
+
         self._count_grok_pattern_matches = count_grok_pattern_matches
         if count_grok_pattern_matches:
             self._grok_matches_path = count_grok_pattern_matches["count_directory_path"]
@@ -68,17 +250,19 @@ class Normalizer(RuleBasedProcessor):
                 "lock_file_path", "count_grok_pattern_matches.lock"
             )
             self._grok_cnt_period = count_grok_pattern_matches["write_period"]
-            self._grok_cnt_timer = time()
+            self._grok_cnt_lock = Lock()
+            self._grok_cnt_writer = None
+            self._grok_cnt_date = None
+            self._grok_cnt_file_path = None
             self._grok_pattern_matches = {}
 
         NormalizerRule.additional_grok_patterns = grok_patterns
 
-        with open(regex_mapping, "r") as file:
-            self._regex_mapping = yaml.load(file)
+        self._regex_mapping = _load_yaml_file(regex_mapping)
 
         if html_replace_fields:
-            with open(html_replace_fields, "r") as file:
-                self._html_replace_fields = yaml.load(file)
+            # A set, so the per-field membership check is a hash lookup instead of a list scan
+            self._html_replace_fields = frozenset(_load_yaml_file(html_replace_fields))
 
         self.add_rules_from_directory(specific_rules_dirs, generic_rules_dirs)
 
@@ -122,7 +306,7 @@ class Normalizer(RuleBasedProcessor):
         self._conflicting_fields.clear()
         self._apply_rules()
         if self._count_grok_pattern_matches:
-            self._write_grok_matches()
+            self._flush_grok_matches()
 
         self.ps.increment_processed_count()
         try:
@@ -130,49 +314,121 @@ class Normalizer(RuleBasedProcessor):
         except DuplicationError as error:
             raise ProcessingWarning(str(error)) from error
 
+    @TimeMeasurement.measure_time("normalizer")
+    def process_batch(self, events: List[dict]):
+        """Normalize a batch of log events by modifying their values in place.
+
+        Events are normalized like repeated calls to process, but duplication warnings are
+        collected and raised together after the whole batch was processed and the optional grok
+        match count write-out runs once per batch instead of once per event. Events with equal
+        top level fields additionally share rule tree traversals through the tree's match cache.
+
+        Batches are processed in a single process on purpose: parallelism across CPU cores is
+        provided by the multiprocessing pipeline (see the process_count configuration), which
+        forks whole worker pipelines and thereby shares all compiled rule state.
+
+        Parameters
+        ----------
+        events : List[dict]
+           A list of dictionaries representing log events.
+
+        """
+        processing_warnings = []
+        for event in events:
+            self._event = event
+            self._conflicting_fields.clear()
+            self._apply_rules()
+            self.ps.increment_processed_count()
+            if self._conflicting_fields:
+                duplication_error = DuplicationError(self._name, self._conflicting_fields)
+                processing_warnings.append(ProcessingWarning(str(duplication_error)))
+        if self._count_grok_pattern_matches:
+            self._flush_grok_matches()
+        if processing_warnings:
+            raise ProcessingWarningCollection(processing_warnings)
+
+    def _flush_grok_matches(self):
+        """Get the grok match counts written, deferring to a writer thread if possible.
+
+        With a write period above zero a daemon thread writes the counts every period, so
+        processing an event only pays for the counter increments. The thread is started
+        lazily on the first processed event, since the processor is created before the
+        pipeline processes are forked and a thread would not survive the fork. A write
+        period of zero means a synchronous write after every event.
+        """
+        if self._grok_cnt_period > 0:
+            if self._grok_cnt_writer is None:
+                self._grok_cnt_writer = Thread(target=self._run_grok_match_writer, daemon=True)
+                self._grok_cnt_writer.start()
+        else:
+            self._write_grok_matches()
+
+    def _run_grok_match_writer(self):
+        while True:
+            sleep(self._grok_cnt_period)
+            try:
+                self._write_grok_matches()
+            except Exception as error:  # pylint: disable=broad-except
+                self._logger.warning(f"Failed to write grok pattern match counts: {error}")
+
     def _write_grok_matches(self):
-        """Write count of matches for each grok pattern into a file if configured time has passed.
+        """Write count of matches for each grok pattern into a file.
 
         If enabled, grok pattern matches are being counted.
-        This method writes them into a file after a configured time has passed.
-        First, it reads the existing counts from the file, then it sums them with the current
-        counts and writes the result back into the file.
+        First, this method reads the existing counts from the file, then it sums them with the
+        current counts and writes the result back into the file.
 
         One file is created per day if anything is written.
         """
-        now = time()
-        if now < self._grok_cnt_timer + self._grok_cnt_period:
-            return
-        self._grok_cnt_timer = now
-
-        current_date = arrow.now().date()
-        weekday = calendar.day_name[current_date.weekday()].lower()
-
-        file_name = f"{current_date}_{weekday}.json"
-        file_path = os.path.join(self._grok_matches_path, file_name)
+        # The file path only changes on day rollover, so it is cached per day
+        current_date = datetime.now().date()
+        if current_date != self._grok_cnt_date:
+            self._grok_cnt_date = current_date
+            weekday = _weekdays[current_date.weekday()]
+            file_name = f"{current_date}_{weekday}.json"
+            self._grok_cnt_file_path = os.path.join(self._grok_matches_path, file_name)
+        file_path = self._grok_cnt_file_path
         Path(self._grok_matches_path).mkdir(parents=True, exist_ok=True)
-        with FileLock(self._file_lock_path):
+        with self._grok_cnt_lock, FileLock(self._file_lock_path):
             json_dict = {}
             if os.path.isfile(file_path):
                 with open(file_path, "r") as grok_json_file:
-                    json_dict = json.load(grok_json_file)
+                    json_dict = ujson.load(grok_json_file)
 
-            for key, value in self._grok_pattern_matches.items():
+            # Iterate a snapshot since the processing thread may insert counters for
+            # newly seen patterns while the writer thread runs; subtract the flushed
+            # value instead of zeroing so concurrent increments are kept
+            for key, value in dict(self._grok_pattern_matches).items():
                 json_dict[key] = json_dict.get(key, 0) + value
-                self._grok_pattern_matches[key] = 0
+                self._grok_pattern_matches[key] -= value
 
             with open(file_path, "w") as grok_json_file:
                 json_dict = dict(reversed(sorted(json_dict.items(), key=lambda items: items[1])))
-                json.dump(json_dict, grok_json_file, indent=4)
+                ujson.dump(json_dict, grok_json_file, indent=4)
+
+    def _split_dotted_field(self, dotted_field: str) -> tuple:
+        """Split a dotted field into its keys, splitting each field only once.
+
+        Field paths come from rules and from grok group names, so the same few paths recur for
+        every event and their splits can be shared across events.
+        """
+        fields = self._dotted_field_cache.get(dotted_field)
+        if fields is None:
+            fields = tuple(dotted_field.split("."))
+            self._dotted_field_cache[dotted_field] = fields
+        return fields
+
+    def _get_event_value(self, dotted_field: str) -> Optional[Union[dict, list, str]]:
+        """Get the value of a dotted field from the current event or None if it is missing."""
+        getter = self._field_getter_cache.get(dotted_field)
+        if getter is None:
+            getter = _create_field_getter(self._split_dotted_field(dotted_field))
+            self._field_getter_cache[dotted_field] = getter
+        return getter(self._event)
 
     def _try_add_field(self, target: Union[str, List[str]], value: str):
         target, value = self._get_transformed_value(target, value)
-
-        if self._field_exists(self._event, target):
-            if self._get_dotted_field_value(self._event, target) != value:
-                self._conflicting_fields.append(target)
-        else:
-            self._add_field(target, value)
+        self._add_field(target, value)
 
     def _get_transformed_value(self, target: Union[str, List[str]], value: str) -> Tuple[str, str]:
         if isinstance(target, list):
@@ -184,34 +440,40 @@ class Normalizer(RuleBasedProcessor):
         return target, value
 
     def _add_field(self, dotted_field: str, value: Union[str, int]):
-        fields = dotted_field.split(".")
-        missing_fields = ujson.loads(ujson.dumps(fields))
+        fields = self._split_dotted_field(dotted_field)
         dict_ = self._event
-        for field in fields:
-            if isinstance(dict_, dict) and field in dict_:
-                dict_ = dict_[field]
-                missing_fields.pop(0)
-            else:
-                break
-        if not isinstance(dict_, dict):
-            self._conflicting_fields.append(dotted_field)
+        for field in fields[:-1]:
+            next_value = dict_.get(field, _MISSING)
+            if next_value is _MISSING:
+                next_value = {}
+                dict_[field] = next_value
+            elif not isinstance(next_value, dict):
+                self._conflicting_fields.append(dotted_field)
+                return
+            dict_ = next_value
+        last_field = fields[-1]
+        existing_value = dict_.get(last_field, _MISSING)
+        if existing_value is not _MISSING:
+            # An equal value is not a conflict, so re-normalizing an event stays idempotent
+            if existing_value != value:
+                self._conflicting_fields.append(dotted_field)
             return
-        for field in missing_fields[:-1]:
-            dict_[field] = {}
-            dict_ = dict_[field]
-        dict_[missing_fields[-1]] = value
+        dict_[last_field] = value
 
         if self._html_replace_fields and dotted_field in self._html_replace_fields:
             if self._has_html_entity(value):
-                dict_[missing_fields[-1] + "_decodiert"] = html.unescape(value)
+                dict_[last_field + "_decodiert"] = html.unescape(value)
 
     @staticmethod
     def _has_html_entity(value):
-        return re.search("&#[0-9]{2,4};", value)
+        return _html_entity_pattern.search(value)
 
     def _replace_field(self, dotted_field: str, value: str):
-        fields = dotted_field.split(".")
-        reduce(lambda dict_, key: dict_[key], fields[:-1], self._event)[fields[-1]] = value
+        fields = self._split_dotted_field(dotted_field)
+        dict_ = self._event
+        for field in fields[:-1]:
+            dict_ = dict_[field]
+        dict_[fields[-1]] = value
 
     def _apply_rules(self):
         """Normalizes Windows Event Logs.
@@ -224,114 +486,117 @@ class Normalizer(RuleBasedProcessor):
         be written in a way that no such warnings are produced during normal operation because each
         warning should be an indicator of incorrect rules or unexpected/changed events.
         """
-        for rule in self._generic_tree.get_matching_rules(self._event):
+        # Share filter match results between the generic and the specific tree walk, so
+        # expressions occurring in both trees are evaluated only once per event.
+        expression_cache = {}
+
+        # isEnabledFor walks the logger hierarchy, so check it once per event instead of
+        # once per matching rule
+        debug_enabled = self._logger.isEnabledFor(DEBUG)
+
+        generic_rule_matched = False
+        for rule in self._generic_tree.get_matching_rules(
+            self._event, expression_cache=expression_cache
+        ):
+            generic_rule_matched = True
             begin = time()
-            if self._logger.isEnabledFor(DEBUG):
+            if debug_enabled:
                 self._logger.debug(f"{self.describe()} processing generic matching event")
             self._try_add_grok(rule)
             self._try_add_timestamps(rule)
-            for before, after in rule.substitutions.items():
+            for before, after in rule.substitution_items:
                 self._try_normalize_event_data_field(before, after)
 
-            processing_time = float("{:.10f}".format(time() - begin))
+            processing_time = round(time() - begin, 10)
             idx = self._generic_tree.get_rule_id(rule)
             self.ps.update_per_rule(idx, processing_time)
 
-        for rule in self._specific_tree.get_matching_rules(self._event):
+        # Generic rules write into the event, so match results cached during the generic
+        # walk may be stale; specific filters must see the mutated event like before
+        if generic_rule_matched:
+            expression_cache.clear()
+
+        for rule in self._specific_tree.get_matching_rules(
+            self._event, expression_cache=expression_cache
+        ):
             begin = time()
-            if self._logger.isEnabledFor(DEBUG):
+            if debug_enabled:
                 self._logger.debug(f"{self.describe()} processing specific matching event")
             self._try_add_grok(rule)
             self._try_add_timestamps(rule)
-            for before, after in rule.substitutions.items():
+            for before, after in rule.substitution_items:
                 self._try_normalize_event_data_field(before, after)
 
-            processing_time = float("{:.10f}".format(time() - begin))
+            processing_time = round(time() - begin, 10)
             idx = self._specific_tree.get_rule_id(rule)
             self.ps.update_per_rule(idx, processing_time)
 
     def _try_add_grok(self, rule: NormalizerRule):
-        for source_field, grok in rule.grok.items():
-            source_value = self._get_dotted_field_value(self._event, source_field)
+        for source_field, grok in rule.grok_items:
+            source_value = self._get_event_value(source_field)
             if source_value is None:
                 continue
 
-            if self._count_grok_pattern_matches:
-                matches = grok.match(source_value, self._grok_pattern_matches)
-            else:
-                matches = grok.match(source_value)
+            try:
+                if self._count_grok_pattern_matches:
+                    matches = grok.match(
+                        source_value,
+                        self._grok_pattern_matches,
+                        timeout=self._grok_pattern_timeout,
+                    )
+                else:
+                    matches = grok.match(source_value, timeout=self._grok_pattern_timeout)
+            except TimeoutError as error:
+                raise ProcessingWarning(
+                    f"Grok matching timed out after {self._grok_pattern_timeout}s "
+                    f"for source field '{source_field}'"
+                ) from error
             for normalized_field, field_value in matches.items():
                 if field_value is not None:
                     self._try_add_field(normalized_field, field_value)
 
     def _try_add_timestamps(self, rule: NormalizerRule):
-        for source_field, normalization in rule.timestamps.items():
-            timestamp_normalization = normalization["timestamp"]
-
-            source_timestamp = self._get_dotted_field_value(self._event, source_field)
+        for (
+            source_field,
+            allow_override,
+            normalization_target,
+            source_formats,
+            source_timezone_name,
+            destination_timezone_name,
+        ) in rule.timestamp_actions:
+            source_timestamp = self._get_event_value(source_field)
 
             if source_timestamp is None:
                 continue
 
-            allow_override = timestamp_normalization.get("allow_override", True)
-            normalization_target = timestamp_normalization["destination"]
-            source_formats = timestamp_normalization["source_formats"]
-            source_timezone = timestamp_normalization["source_timezone"]
-            destination_timezone = timestamp_normalization["destination_timezone"]
-
-            timestamp = None
-            format_parsed = False
-            for source_format in source_formats:
-                try:
-                    if source_format == "ISO8601":
-                        timestamp = parser.isoparse(source_timestamp)
-
-                    elif source_format == "UNIX":
-                        # convert UNIX Epoch timestamp string to int (with or without milliseconds)
-                        new_stamp = int(source_timestamp)
-                        if len(source_timestamp) > 10:
-                            # Epoch with milliseconds
-                            timestamp = datetime.fromtimestamp(
-                                new_stamp / 1000, timezone(source_timezone)
-                            )
-                        else:
-                            # Epoch without milliseconds
-                            timestamp = datetime.fromtimestamp(new_stamp, timezone(source_timezone))
-                    else:
-                        timestamp = datetime.strptime(source_timestamp, source_format)
-                        # Set year to current year if no year was provided in timestamp
-                        if timestamp.year == 1900:
-                            timestamp = timestamp.replace(year=datetime.now().year)
-                    format_parsed = True
-                    break
-                except ValueError:
-                    pass
-            if not format_parsed:
+            converted_time = _normalize_timestamp(
+                source_timestamp,
+                source_formats,
+                source_timezone_name,
+                destination_timezone_name,
+                datetime.now().year,
+            )
+            if converted_time is None:
                 raise NormalizerError(
                     self._name,
                     'Could not parse source timestamp "{}" with formats "{}"'.format(
-                        source_timestamp, source_formats
+                        source_timestamp, list(source_formats)
                     ),
                 )
 
-            time_zone = timezone(source_timezone)
-            if not timestamp.tzinfo:
-                timestamp = time_zone.localize(timestamp)
-                timestamp = timezone(source_timezone).normalize(timestamp)
-            timestamp = timestamp.astimezone(timezone(destination_timezone))
-            timestamp = timezone(destination_timezone).normalize(timestamp)
-
-            converted_time = timestamp.isoformat()
-            converted_time = converted_time.replace("+00:00", "Z")
-
             if allow_override:
                 self._replace_field(normalization_target, converted_time)
             else:
                 self._try_add_field(normalization_target, converted_time)
 
     def _try_normalize_event_data_field(self, field: str, normalized_field: str):
-        if self._field_exists(self._event, field):
-            self._try_add_field(normalized_field, self._get_dotted_field_value(self._event, field))
+        value = self._event
+        for sub_field in self._split_dotted_field(field):
+            if isinstance(value, dict) and sub_field in value:
+                value = value[sub_field]
+            else:
+                return
+        self._try_add_field(normalized_field, value)
 
     def _raise_warning_if_fields_already_existed(self):
         if self._conflicting_fields:
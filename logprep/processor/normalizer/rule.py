@@ -3,8 +3,23 @@
 from typing import Union, Dict, List
 
 import re
+
 from pygrok import Grok
 
+try:
+    # pygrok compiles with the regex module whenever it is installed; its support for
+    # duplicate group names also allows combining grok alternatives into one pattern.
+    # A DFA based engine (re2, hyperscan) could scan all alternatives of a rule in linear
+    # time, but none of them supports the named groups grok output depends on without a
+    # second capture pass, so the regex module remains the single engine here.
+    # Grok expansions are not rewritten with atomic groups either: DATA and GREEDYDATA
+    # translate to lazy quantifiers, which an atomic group would freeze at their minimal
+    # match and thereby break, and alternation branches cannot spill backtracking into each
+    # other to begin with. Runaway backtracking is bounded by the match timeout instead.
+    import regex
+except ImportError:  # pragma: no cover
+    regex = None
+
 from logprep.filter.expression.filter_expression import FilterExpression
 from logprep.processor.base.rule import Rule, InvalidRuleDefinitionError
 
@@ -46,34 +61,249 @@ class GrokWrapper:
     """Wrap around pygrok to add delimiter support."""
 
     grok_delimiter_pattern = re.compile(GROK_DELIMITER)
+    _compiled_grok_cache = {}
+    _wrapper_cache = {}
+
+    _grok_reference_pattern = re.compile(r"%{[^}]*}")
+    _regex_metacharacters = frozenset("\\^$.|?*+()[]{}")
 
     def __init__(self, patterns: Union[str, List[str]], **kwargs):
         if isinstance(patterns, str):
-            self._grok_list = [Grok(f"^{patterns}$", **kwargs)]
+            patterns = [patterns]
+        self._grok_list = [self._get_grok(f"^{pattern}$", **kwargs) for pattern in patterns]
+        self._patterns = tuple(grok.pattern for grok in self._grok_list)
+        self._field_converters = [
+            {
+                field: int if type_name == "int" else float
+                for field, type_name in grok.type_mapper.items()
+                if type_name in ("int", "float")
+            }
+            for grok in self._grok_list
+        ]
+        # Dotted field names are fixed per pattern, so replacing the delimiter happens once at
+        # compile time instead of once per captured field per event.
+        self._dotted_field_names = [
+            {
+                field: self.grok_delimiter_pattern.sub(".", field)
+                for field in grok.regex_obj.groupindex
+            }
+            for grok in self._grok_list
+        ]
+        self._required_literals = [self._get_required_literal(pattern) for pattern in patterns]
+
+        self._combined_field_converters = {}
+        self._combined_dotted_field_names = {}
+        for dotted_field_names in self._dotted_field_names:
+            self._combined_dotted_field_names.update(dotted_field_names)
+        self._combined_regex = self._create_combined_regex()
+        # A literal prefilter for the combined pattern, mirroring how DFA engines gate their
+        # scan on required literals. It only exists when every alternative has one, since a
+        # literal-free alternative could match any text.
+        if all(literal is not None for literal in self._required_literals):
+            self._combined_literals = tuple(set(self._required_literals))
         else:
-            patterns = [f"^{pattern}$" for pattern in patterns]
-            self._grok_list = [Grok(pattern_item, **kwargs) for pattern_item in patterns]
-
-        self._match_cnt_initialized = False
-
-    def match(self, text: str, pattern_matches: dict = None) -> Dict[str, str]:
-        """Match string via grok using delimiter and count matches if enabled."""
-        if pattern_matches is not None and not self._match_cnt_initialized:
-            for grok in self._grok_list:
-                pattern_matches[grok.pattern] = 0
-            self._match_cnt_initialized = True
-
-        for grok in self._grok_list:
-            matches = grok.match(text)
-            if matches:
-                if pattern_matches is not None:
-                    pattern_matches[grok.pattern] += 1
-                dotted_matches = dict()
-                for key, value in matches.items():
-                    dotted_matches[self.grok_delimiter_pattern.sub(".", key)] = value
-                return dotted_matches
+            self._combined_literals = None
+
+    def _create_combined_regex(self):
+        """Combine the compiled grok alternatives into one alternation pattern.
+
+        The combined pattern checks all alternatives of this wrapper with a single scan and
+        keeps the first-matching-alternative semantics, since the anchored branches are tried
+        in list order. It requires the regex module for group names repeated across branches.
+        Combining is skipped when an alternative captures no fields (matching it must fall
+        through to later alternatives) or when alternatives convert the same field to
+        different types.
+        """
+        if regex is None or len(self._grok_list) < 2:
+            return None
+        for grok, field_converters in zip(self._grok_list, self._field_converters):
+            if not grok.regex_obj.groupindex:
+                self._combined_field_converters = {}
+                return None
+            for field, converter in field_converters.items():
+                if self._combined_field_converters.setdefault(field, converter) is not converter:
+                    self._combined_field_converters = {}
+                    return None
+        combined = self._factor_common_prefix([grok.regex_obj.pattern for grok in self._grok_list])
+        try:
+            return regex.compile(combined)
+        except regex.error:
+            self._combined_field_converters = {}
+            return None
+
+    @classmethod
+    def _factor_common_prefix(cls, patterns: List[str]) -> str:
+        """Join the patterns into one alternation, factoring out a safely shared prefix.
+
+        Alternatives often share their leading tokens (anchor, literal markers), which the
+        engine would otherwise re-match per branch. The prefix is only factored when doing so
+        cannot change semantics: it must leave no group, class or escape open and must be free
+        of quantifiers and alternations, so it matches in exactly one way and cannot shift
+        which branch matches first; additionally no alternative may continue with a quantifier
+        or contain a top level alternation of its own.
+        """
+        prefix_length = len(min(patterns, key=len))
+        for pattern in patterns[1:]:
+            while pattern[:prefix_length] != patterns[0][:prefix_length]:
+                prefix_length -= 1
+        while prefix_length > 1 and not cls._is_safe_prefix(patterns, prefix_length):
+            prefix_length -= 1
+        if prefix_length <= 1:
+            return "|".join(f"(?:{pattern})" for pattern in patterns)
+        prefix = patterns[0][:prefix_length]
+        alternation = "|".join(f"(?:{pattern[prefix_length:]})" for pattern in patterns)
+        return f"{prefix}(?:{alternation})"
+
+    @staticmethod
+    def _is_safe_prefix(patterns: List[str], prefix_length: int) -> bool:
+        for pattern in patterns:
+            if prefix_length < len(pattern) and pattern[prefix_length] in "?*+{":
+                return False
+            depth = 0
+            in_class = False
+            escaped = False
+            for position, character in enumerate(pattern):
+                if escaped:
+                    escaped = False
+                elif character == "\\":
+                    escaped = True
+                elif in_class:
+                    in_class = character != "]"
+                elif character == "[":
+                    in_class = True
+                elif character == "(":
+                    depth += 1
+                elif character == ")":
+                    depth -= 1
+                elif character == "|" and depth == 0:
+                    return False
+                elif character in "?*+{|" and position < prefix_length:
+                    return False
+                if position == prefix_length - 1 and (depth != 0 or in_class or escaped):
+                    return False
+        return True
+
+    @classmethod
+    def from_patterns(cls, patterns: Union[str, List[str]], **kwargs) -> "GrokWrapper":
+        """Get a wrapper for a pattern list, constructing each distinct list only once.
+
+        Every grok definition is compiled during rule validation and again during rule
+        creation, and reloading rule directories compiles it once more. Wrappers are not
+        modified after construction, so those compilations can share one instance.
+        """
+        if isinstance(patterns, str):
+            patterns = [patterns]
+        cache_key = (tuple(patterns), tuple(sorted(kwargs.items())))
+        wrapper = cls._wrapper_cache.get(cache_key)
+        if wrapper is None:
+            wrapper = cls(patterns, **kwargs)
+            cls._wrapper_cache[cache_key] = wrapper
+        return wrapper
+
+    @classmethod
+    def _get_required_literal(cls, pattern: str) -> Union[str, None]:
+        """Extract the longest literal a text must contain for the pattern to match it.
+
+        The literal gates the pattern before its regex runs: a substring search is much
+        cheaper than a failing regex match. It is only extracted when the text outside of
+        grok references contains no regex metacharacters, since those could make any of the
+        literals optional.
+        """
+        remainder = cls._grok_reference_pattern.sub("\x00", pattern)
+        if cls._regex_metacharacters.intersection(remainder):
+            return None
+        literals = [literal for literal in remainder.split("\x00") if len(literal) >= 3]
+        if not literals:
+            return None
+        return max(literals, key=len)
+
+    @classmethod
+    def _get_grok(cls, pattern: str, **kwargs) -> Grok:
+        """Get a compiled grok object for a pattern, compiling it only on the first request.
+
+        Constructing a grok object reads every pattern file from disk and compiles the resolved
+        regex, so identical patterns appearing in several rules (or in rule validation and rule
+        creation) share one compiled instance. Grok objects are immutable after construction.
+        """
+        cache_key = (pattern, tuple(sorted(kwargs.items())))
+        grok = cls._compiled_grok_cache.get(cache_key)
+        if grok is None:
+            grok = Grok(pattern, **kwargs)
+            cls._compiled_grok_cache[cache_key] = grok
+        return grok
+
+    def match(
+        self, text: str, pattern_matches: dict = None, timeout: float = None
+    ) -> Dict[str, str]:
+        """Match string via grok using delimiter and count matches if enabled.
+
+        An optional timeout in seconds bounds the matching time per pattern and lets a
+        TimeoutError escalate to the caller. It requires grok to be compiled with the regex
+        module, which is the case whenever the regex module is installed.
+        """
+        if pattern_matches is not None:
+            for pattern in self._patterns:
+                if pattern not in pattern_matches:
+                    pattern_matches[pattern] = 0
+
+        # The combined pattern cannot attribute a match to a single alternative, so it is only
+        # used when matches are not counted per pattern.
+        if pattern_matches is None and self._combined_regex is not None:
+            if self._combined_literals is not None and not any(
+                literal in text for literal in self._combined_literals
+            ):
+                return dict()
+            if timeout is None:
+                match_obj = self._combined_regex.fullmatch(text)
+            else:
+                match_obj = self._combined_regex.fullmatch(text, timeout=timeout)
+            if match_obj is None:
+                return dict()
+            return self._dotted_matches(
+                match_obj.groupdict(),
+                self._combined_field_converters,
+                self._combined_dotted_field_names,
+            )
+
+        for grok, pattern, field_converters, dotted_field_names, required_literal in zip(
+            self._grok_list,
+            self._patterns,
+            self._field_converters,
+            self._dotted_field_names,
+            self._required_literals,
+        ):
+            if required_literal is not None and required_literal not in text:
+                continue
+            if timeout is None:
+                match_obj = grok.regex_obj.fullmatch(text)
+            else:
+                match_obj = grok.regex_obj.fullmatch(text, timeout=timeout)
+            if match_obj is None:
+                continue
+            captured = match_obj.groupdict()
+            if not captured:
+                continue
+            if pattern_matches is not None:
+                pattern_matches[pattern] += 1
+            return self._dotted_matches(captured, field_converters, dotted_field_names)
         return dict()
 
+    @staticmethod
+    def _dotted_matches(
+        captured: Dict[str, str], field_converters: dict, dotted_field_names: dict
+    ) -> Dict[str, str]:
+        """Convert captured field values and map field names to their dotted form."""
+        if not field_converters:
+            return {dotted_field_names[key]: value for key, value in captured.items()}
+        dotted_matches = dict()
+        for key, value in captured.items():
+            if value is not None:
+                converter = field_converters.get(key)
+                if converter is not None:
+                    value = converter(value)
+            dotted_matches[dotted_field_names[key]] = value
+        return dotted_matches
+
 
 class NormalizerRule(Rule):
     """Check if documents match a filter."""
@@ -90,6 +320,25 @@ class NormalizerRule(Rule):
 
         self._parse_normalizations(normalizations)
 
+        # Flattened action sequences, so applying the rule iterates precomputed tuples
+        # instead of rebuilding dict views per event
+        self._grok_items = tuple(self._grok.items())
+        self._timestamp_items = tuple(self._timestamps.items())
+        self._substitution_items = tuple(self._substitutions.items())
+        # Timestamp normalizations fully unpacked at rule creation, so applying the rule
+        # reads plain tuples instead of chasing the configuration dict per event
+        self._timestamp_actions = tuple(
+            (
+                source_field,
+                normalization["timestamp"].get("allow_override", True),
+                normalization["timestamp"]["destination"],
+                tuple(normalization["timestamp"]["source_formats"]),
+                normalization["timestamp"]["source_timezone"],
+                normalization["timestamp"]["destination_timezone"],
+            )
+            for source_field, normalization in self._timestamp_items
+        )
+
     def _parse_normalizations(self, normalizations):
         for src, norm in normalizations.items():
             if isinstance(norm, dict) and norm.get("grok"):
@@ -98,20 +347,20 @@ class NormalizerRule(Rule):
                     patterns = self.extract_field_pattern.findall(grok)
                     for pattern in patterns:
                         if len(pattern) >= 2:
-                            sub_fields = re.findall(self.sub_fields_pattern, pattern[1])
+                            sub_fields = self.sub_fields_pattern.findall(pattern[1])
                             if sub_fields:
                                 mutable_pattern = list(pattern)
                                 mutable_pattern[1] = GROK_DELIMITER.join(
                                     (sub_field[1] for sub_field in sub_fields)
                                 )
-                                to_replace = re.escape(r"%{" + r":".join(pattern))
+                                to_replace = r"%{" + r":".join(pattern)
                                 transformed_fields_names = "%{" + ":".join(mutable_pattern)
-                                norm["grok"][idx] = re.sub(
-                                    to_replace, transformed_fields_names, norm["grok"][idx]
+                                norm["grok"][idx] = norm["grok"][idx].replace(
+                                    to_replace, transformed_fields_names
                                 )
                     self._grok.update(
                         {
-                            src: GrokWrapper(
+                            src: GrokWrapper.from_patterns(
                                 norm["grok"],
                                 custom_patterns_dir=NormalizerRule.additional_grok_patterns,
                             )
@@ -141,10 +390,26 @@ class NormalizerRule(Rule):
     def grok(self) -> dict:
         return self._grok
 
+    @property
+    def grok_items(self) -> tuple:
+        return self._grok_items
+
     @property
     def timestamps(self) -> dict:
         return self._timestamps
 
+    @property
+    def timestamp_items(self) -> tuple:
+        return self._timestamp_items
+
+    @property
+    def timestamp_actions(self) -> tuple:
+        return self._timestamp_actions
+
+    @property
+    def substitution_items(self) -> tuple:
+        return self._substitution_items
+
     # pylint: enable=C0111
 
     @staticmethod
@@ -174,7 +439,7 @@ class NormalizerRule(Rule):
                         if any([not isinstance(pattern, str) for pattern in grok]):
                             raise InvalidNormalizationDefinition(value)
                     try:
-                        GrokWrapper(
+                        GrokWrapper.from_patterns(
                             grok, custom_patterns_dir=NormalizerRule.additional_grok_patterns
                         )
                     except Exception as error:
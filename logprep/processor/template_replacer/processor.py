@@ -8,7 +8,12 @@ from os.path import isdir, realpath, join
 
 from multiprocessing import current_process
 
-from ruamel.yaml import YAML
+from yaml import load
+
+try:
+    from yaml import CSafeLoader as SafeLoader
+except ImportError:  # pragma: no cover
+    from yaml import SafeLoader
 
 from logprep.processor.base.processor import RuleBasedProcessor
 from logprep.processor.template_replacer.rule import TemplateReplacerRule
@@ -21,8 +26,6 @@ from logprep.processor.base.exceptions import (
 from logprep.util.processor_stats import ProcessorStats
 from logprep.util.time_measurement import TimeMeasurement
 
-yaml = YAML(typ="safe", pure=True)
-
 
 class TemplateReplacerError(BaseException):
     """Base class for TemplateReplacer related exceptions."""
@@ -55,14 +58,17 @@ class TemplateReplacer(RuleBasedProcessor):
 
         self._target_field = pattern["target_field"]
         self._target_field_split = self._target_field.split(".")
+        self._target_field_parents = self._target_field_split[:-1]
+        self._target_field_leaf = self._target_field_split[-1]
         self._fields = pattern["fields"]
+        self._fields_split = [tuple(field.split(".")) for field in self._fields]
         delimiter = pattern["delimiter"]
         allow_delimiter_field = pattern["allowed_delimiter_field"]
         allow_delimiter_index = self._fields.index(allow_delimiter_field)
 
         self._mapping = dict()
         with open(template_path, "r") as template_file:
-            template = yaml.load(template_file)
+            template = load(template_file, Loader=SafeLoader)
 
         for key, value in template.items():
             split_key = key.split(delimiter)
@@ -80,20 +86,7 @@ class TemplateReplacer(RuleBasedProcessor):
                     f"Not enough delimiters in '{template_path}' " f"to populate {self._fields}",
                 )
 
-            try:
-                _dict = self._mapping
-                for idx, recombined_key in enumerate(recombined_keys):
-                    if idx < len(self._fields) - 1:
-                        if not _dict.get(recombined_key):
-                            _dict[recombined_key] = dict()
-                        _dict = _dict[recombined_key]
-                    else:
-                        _dict[recombined_key] = value
-
-            except ValueError as error:
-                raise TemplateReplacerError(
-                    self._name, "template_replacer template is invalid!"
-                ) from error
+            self._mapping[tuple(recombined_keys)] = value
 
     # pylint: disable=arguments-differ
     def add_rules_from_directory(self, rule_paths: List[str]):
@@ -103,12 +96,11 @@ class TemplateReplacer(RuleBasedProcessor):
                 raise NotARulesDirectoryError(self._name, path)
 
             for root, _, files in walk(path):
-                json_files = []
-                for file in files:
-                    if (file.endswith(".json") or file.endswith(".yml")) and not file.endswith(
-                        "_test.json"
-                    ):
-                        json_files.append(file)
+                json_files = [
+                    file
+                    for file in files
+                    if file.endswith((".json", ".yml")) and not file.endswith("_test.json")
+                ]
                 for file in json_files:
                     rules = self._load_rules_from_file(join(root, file))
                     for rule in rules:
@@ -136,41 +128,40 @@ class TemplateReplacer(RuleBasedProcessor):
     def process(self, event: dict):
         self._event = event
 
+        sample_timing = self.ps.sample_rule_timing()
         for rule in self._tree.get_matching_rules(event):
-            begin = time()
-            self._apply_rules(event)
-            processing_time = float("{:.10f}".format(time() - begin))
-            idx = self._tree.get_rule_id(rule)
-            self.ps.update_per_rule(idx, processing_time)
+            if sample_timing:
+                begin = time()
+                self._apply_rules(event)
+                processing_time = time() - begin
+                self.ps.update_rule_timing(self._tree.get_rule_id(rule), processing_time)
+            else:
+                self._apply_rules(event)
+            self.ps.update_match_count(self._tree.get_rule_id(rule))
 
         self.ps.increment_processed_count()
 
     def _apply_rules(self, event):
-        _dict = self._mapping
-        for field in self._fields:
-            dotted_field_value = self._get_dotted_field_value(event, field)
+        mapping_key = []
+        for field_keys in self._fields_split:
+            dotted_field_value = event
+            for key in field_keys:
+                if isinstance(dotted_field_value, dict) and key in dotted_field_value:
+                    dotted_field_value = dotted_field_value[key]
+                else:
+                    return
             if dotted_field_value is None:
                 return
+            mapping_key.append(str(dotted_field_value))
 
-            value = str(dotted_field_value)
-            _dict = _dict.get(value, None)
-            if _dict is None:
-                return
+        replacement = self._mapping.get(tuple(mapping_key))
+        if replacement is None:
+            return
 
-        if _dict is not None:
-            if self._field_exists(event, self._target_field):
-                _event = event
-                for subfield in self._target_field_split[:-1]:
-                    _event = _event[subfield]
-                _event[self._target_field_split[-1]] = _dict
-
-    @staticmethod
-    def _field_exists(event: dict, dotted_field: str) -> bool:
-        fields = dotted_field.split(".")
-        dict_ = event
-        for field in fields:
-            if field in dict_:
-                dict_ = dict_[field]
-            else:
-                return False
-        return True
+        _event = event
+        for subfield in self._target_field_parents:
+            if not isinstance(_event, dict) or subfield not in _event:
+                return
+            _event = _event[subfield]
+        if isinstance(_event, dict) and self._target_field_leaf in _event:
+            _event[self._target_field_leaf] = replacement
@@ -1,4 +1,4 @@
-import json
+import ujson
 
 from yaml import safe_dump
 
@@ -37,7 +37,7 @@ def parse_jsonl(jsonl_path):
     with open(jsonl_path, "r") as jsonl_file:
         for json_string in jsonl_file.readlines():
             if json_string.strip() != "":
-                event = json.loads(json_string)
+                event = ujson.loads(json_string)
                 parsed_events.append(event)
     return parsed_events
 
@@ -57,4 +57,4 @@ def parse_json(json_path):
         The dictionary representing the json.
     """
     with open(json_path, "r") as json_file:
-        return json.load(json_file)
+        return ujson.load(json_file)
@@ -52,10 +52,14 @@ class StatsClassesController:
 class ProcessorStats:
     """Used to track processor stats."""
 
+    #: Measure per-rule processing times only for every nth processed event.
+    RULE_TIMING_SAMPLE_RATE = 16
+
     def __init__(self):
         self.aggr_data = None
         self._max_time = None
         self.num_rules = 0
+        self._sample_counter = 0
         self.reset_statistics()
 
     def reset_statistics(self):
@@ -74,6 +78,26 @@ class ProcessorStats:
         self.aggr_data["matches_per_idx"][idx] += 1
         self.aggr_data["times_per_idx"][idx] += processing_time
 
+    def sample_rule_timing(self) -> bool:
+        """Check if per-rule processing times should be measured for the current event.
+
+        Timing every rule application requires two clock reads per matching rule, which is
+        noticeable for large rule sets, so only every nth event gets measured.
+        """
+        self._sample_counter = (self._sample_counter + 1) % ProcessorStats.RULE_TIMING_SAMPLE_RATE
+        return self._sample_counter == 0
+
+    def update_match_count(self, idx: int):
+        """Update matches per rule in aggregation data."""
+        self.aggr_data["matches"] += 1
+        self.aggr_data["matches_per_idx"][idx] += 1
+
+    def update_rule_timing(self, idx: int, processing_time: float):
+        """Add a sampled processing time, extrapolated to the events that were not measured."""
+        self.aggr_data["times_per_idx"][idx] += (
+            processing_time * ProcessorStats.RULE_TIMING_SAMPLE_RATE
+        )
+
     @property
     def processed_count(self):
         return self.aggr_data["processed"]
@@ -294,6 +294,125 @@ class TestRuleTree:
 
         assert rt.get_matching_rules({"EventID": "1", "winlog": "123"}) == [subrule, rule]
 
+    def test_match_memoized_for_existence_only_filters(self):
+        rule_tree = RuleTree()
+        rule = PreDetectorRule._create_from_dict(
+            {
+                "filter": "foo",
+                "pre_detector": {
+                    "id": 1,
+                    "title": "1",
+                    "severity": "0",
+                    "case_condition": "directly",
+                    "mitre": [],
+                },
+            }
+        )
+        rule_tree.add_rule(rule)
+
+        assert rule_tree.get_matching_rules({"foo": "123"}) == [rule]
+        assert rule_tree.get_matching_rules({"foo": "other value"}) == [rule]
+        assert rule_tree.get_matching_rules({"bar": "123"}) == []
+
+    def test_match_with_value_based_filters_is_not_memoized_by_event_shape(self):
+        rule_tree = RuleTree()
+        rule = PreDetectorRule._create_from_dict(
+            {
+                "filter": "winlog: 123",
+                "pre_detector": {
+                    "id": 1,
+                    "title": "1",
+                    "severity": "0",
+                    "case_condition": "directly",
+                    "mitre": [],
+                },
+            }
+        )
+        rule_tree.add_rule(rule)
+
+        assert rule_tree.get_matching_rules({"winlog": "123"}) == [rule]
+        assert rule_tree.get_matching_rules({"winlog": "456"}) == []
+
+    def test_match_with_expression_cache_returns_same_matches(self):
+        rule_tree = RuleTree()
+        rule = PreDetectorRule._create_from_dict(
+            {
+                "filter": "winlog: 123 AND test: (Good OR Okay)",
+                "pre_detector": {
+                    "id": 1,
+                    "title": "1",
+                    "severity": "0",
+                    "case_condition": "directly",
+                    "mitre": [],
+                },
+            }
+        )
+        rule_tree.add_rule(rule)
+
+        expression_cache = {}
+        event = {"winlog": "123", "test": "Good"}
+        assert rule_tree.get_matching_rules(event, expression_cache=expression_cache) == [rule]
+        assert expression_cache
+        assert rule_tree.get_matching_rules(event, expression_cache=expression_cache) == [rule]
+
+        assert rule_tree.get_matching_rules({"winlog": "456"}, expression_cache={}) == []
+
+    def test_match_with_many_rules_on_same_field_uses_child_index(self):
+        rule_tree = RuleTree()
+        rules = {}
+        for event_id in ["1111", "1112", "2222", "1234", "123456789"]:
+            rule = PreDetectorRule._create_from_dict(
+                {
+                    "filter": f"winlog: {event_id}",
+                    "pre_detector": {
+                        "id": 1,
+                        "title": "1",
+                        "severity": "0",
+                        "case_condition": "directly",
+                        "mitre": [],
+                    },
+                }
+            )
+            rule_tree.add_rule(rule)
+            rules[event_id] = rule
+
+        assert rule_tree.get_matching_rules({"winlog": "1112"}) == [rules["1112"]]
+        assert rule_tree.get_matching_rules({"winlog": 1234}) == [rules["1234"]]
+        assert rule_tree.get_matching_rules({"winlog": ["1111", "2222"]}) == [
+            rules["1111"],
+            rules["2222"],
+        ]
+        assert rule_tree.get_matching_rules({"winlog": "0000"}) == []
+        assert rule_tree.get_matching_rules({"other": "1111"}) == []
+
+    def test_match_with_child_index_keeps_matching_unindexed_rules(self):
+        rule_tree = RuleTree()
+        rules = []
+        filters = [f"winlog: {event_id}" for event_id in ["1111", "1112", "2222", "1234"]]
+        filters += ["winlog", "other_field: foo"]
+        for filter_ in filters:
+            rule = PreDetectorRule._create_from_dict(
+                {
+                    "filter": filter_,
+                    "pre_detector": {
+                        "id": 1,
+                        "title": "1",
+                        "severity": "0",
+                        "case_condition": "directly",
+                        "mitre": [],
+                    },
+                }
+            )
+            rule_tree.add_rule(rule)
+            rules.append(rule)
+
+        matching_rules = rule_tree.get_matching_rules({"winlog": "1112", "other_field": "foo"})
+
+        assert rules[1] in matching_rules
+        assert rules[4] in matching_rules
+        assert rules[5] in matching_rules
+        assert len(matching_rules) == 3
+
     def test_get_size(self):
         rt = RuleTree()
         rule = PreDetectorRule._create_from_dict(
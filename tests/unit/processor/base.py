@@ -1,12 +1,12 @@
 # pylint: disable=missing-module-docstring
 # pylint: disable=protected-access
-import json
 import re
 from abc import ABC, abstractmethod
 from encodings import utf_8
 from logging import getLogger
 
 import pytest
+import ujson
 
 
 from logprep.framework.rule_tree.rule_tree import RuleTree
@@ -53,7 +53,7 @@ class BaseProcessorTestCase(ABC):
             )
             for rule_path in rule_paths:
                 with open(rule_path, "r", encoding="utf8") as rule_file:
-                    rules = json.load(rule_file)
+                    rules = ujson.load(rule_file)
                     for rule in rules:
                         specific_rules.append(rule)
 
@@ -552,6 +552,32 @@ class TestGenericResolver:
         with pytest.raises(DuplicationError):
             generic_resolver.process(document)
 
+    def test_resolve_generic_ignore_case(self, temp_rule_dir, generic_resolver_config):
+        rule = [
+            {
+                "filter": "to_resolve",
+                "generic_resolver": {
+                    "field_mapping": {"to_resolve": "resolved"},
+                    "resolve_list": {".*HELLO\\d": "Greeting"},
+                    "ignore_case": True,
+                },
+            }
+        ]
+
+        self.setup_multi_rule(generic_resolver_config, rule, temp_rule_dir)
+
+        generic_resolver = GenericResolverFactory.create(
+            "test-generic-resolver", generic_resolver_config, logger
+        )
+
+        expected = {"to_resolve": "something hello1", "resolved": "Greeting"}
+
+        document = {"to_resolve": "something hello1"}
+
+        generic_resolver.process(document)
+
+        assert document == expected
+
     def test_resolve_generic_with_multiple_match_first_only(
         self, temp_rule_dir, generic_resolver_config
     ):
@@ -584,6 +610,121 @@ class TestGenericResolver:
 
         assert document == expected
 
+    def test_resolve_generic_from_malformed_file_does_not_prevent_creation(
+        self, temp_rule_dir, generic_resolver_config
+    ):
+        malformed_mapping_path = path.join(tempfile.mkdtemp(), "malformed_mapping.yml")
+        with open(malformed_mapping_path, "w") as malformed_mapping_file:
+            malformed_mapping_file.write("ab: ab_server_type\n  fg: [")
+
+        rule = [
+            {
+                "filter": "to_resolve",
+                "generic_resolver": {
+                    "field_mapping": {"to_resolve": "resolved"},
+                    "resolve_from_file": {
+                        "path": malformed_mapping_path,
+                        "pattern": r"\d*(?P<mapping>[a-z]+)\d*",
+                    },
+                },
+            }
+        ]
+
+        self.setup_multi_rule(generic_resolver_config, rule, temp_rule_dir)
+
+        generic_resolver = GenericResolverFactory.create(
+            "test-generic-resolver", generic_resolver_config, logger
+        )
+
+        assert isinstance(generic_resolver, GenericResolver)
+
+    def test_resolve_generic_rule_chain_reads_field_written_by_earlier_rule(
+        self, temp_rule_dir, generic_resolver_config
+    ):
+        rule = [
+            {
+                "filter": "to_resolve",
+                "generic_resolver": {
+                    "field_mapping": {"resolved": "early"},
+                    "resolve_list": {"Greeting": "Too early"},
+                },
+            },
+            {
+                "filter": "to_resolve",
+                "generic_resolver": {
+                    "field_mapping": {"to_resolve": "resolved"},
+                    "resolve_list": {"hello": "Greeting"},
+                },
+            },
+            {
+                "filter": "to_resolve",
+                "generic_resolver": {
+                    "field_mapping": {"resolved": "final"},
+                    "resolve_list": {"Greeting": "Resolved greeting"},
+                },
+            },
+        ]
+
+        self.setup_multi_rule(generic_resolver_config, rule, temp_rule_dir)
+
+        generic_resolver = GenericResolverFactory.create(
+            "test-generic-resolver", generic_resolver_config, logger
+        )
+
+        document = {"to_resolve": "hello"}
+
+        generic_resolver.process(document)
+
+        assert "early" not in document
+        assert document.get("resolved") == "Greeting"
+        assert document.get("final") == "Resolved greeting"
+
+    def test_resolve_generic_with_same_patterns_but_different_values(
+        self, temp_rule_dir, generic_resolver_config
+    ):
+        rule = [
+            {
+                "filter": "to_resolve_1",
+                "generic_resolver": {
+                    "field_mapping": {"to_resolve_1": "resolved"},
+                    "resolve_list": OrderedDict(
+                        {".*HELLO\\d": "Greeting A", "(bye) now": "Farewell A"}
+                    ),
+                },
+            },
+            {
+                "filter": "to_resolve_2",
+                "generic_resolver": {
+                    "field_mapping": {"to_resolve_2": "resolved"},
+                    "resolve_list": OrderedDict(
+                        {".*HELLO\\d": "Greeting B", "(bye) now": "Farewell B"}
+                    ),
+                },
+            },
+        ]
+
+        self.setup_multi_rule(generic_resolver_config, rule, temp_rule_dir)
+
+        generic_resolver = GenericResolverFactory.create(
+            "test-generic-resolver", generic_resolver_config, logger
+        )
+
+        document = {"to_resolve_1": "something HELLO1"}
+        generic_resolver.process(document)
+        assert document["resolved"] == "Greeting A"
+
+        document = {"to_resolve_2": "something HELLO1"}
+        generic_resolver.process(document)
+        assert document["resolved"] == "Greeting B"
+
+        document = {"to_resolve_1": "bye now"}
+        generic_resolver.process(document)
+        assert document["resolved"] == "Farewell A"
+
+        document = {"to_resolve_2": "bye now"}
+        generic_resolver.process(document)
+        assert document["resolved"] == "Farewell B"
+
     @staticmethod
     def setup_multi_rule(generic_resolver_config, rule, temp_rule_dir):
         with open(path.join(temp_rule_dir, "test_rule.json"), "w") as test_rule:
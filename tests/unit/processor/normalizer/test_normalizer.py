@@ -3,8 +3,8 @@ import calendar
 import json
 import os
 import tempfile
+from datetime import datetime
 
-import arrow
 import pytest
 
 from tests.unit.processor.base import BaseProcessorTestCase
@@ -13,7 +13,11 @@ pytest.importorskip("logprep.processor.normalizer")
 
 import copy
 
-from logprep.processor.base.processor import ProcessingWarning, RuleBasedProcessor
+from logprep.processor.base.processor import (
+    ProcessingWarning,
+    ProcessingWarningCollection,
+    RuleBasedProcessor,
+)
 from logprep.processor.normalizer.exceptions import NormalizerError
 from logprep.processor.normalizer.factory import Normalizer, NormalizerFactory
 from logprep.processor.normalizer.rule import (
@@ -49,6 +53,24 @@ class TestNormalizer(BaseProcessorTestCase):
         specific_rule = NormalizerRule._create_from_dict(rule)
         self.object._specific_tree.add_rule(specific_rule, self.logger)
 
+    def _load_generic_rule(self, rule):
+        generic_rule = NormalizerRule._create_from_dict(rule)
+        self.object._generic_tree.add_rule(generic_rule, self.logger)
+
+    def test_specific_rule_matches_on_field_written_by_generic_rule(self):
+        self._load_generic_rule({"filter": "trigger: 1", "normalize": {"trigger": "copied"}})
+        self._load_generic_rule(
+            {"filter": "copied: 1", "normalize": {"trigger": "copied_by_generic"}}
+        )
+        self._load_specific_rule({"filter": "copied: 1", "normalize": {"copied": "copied_again"}})
+
+        document = {"trigger": "1"}
+
+        self.object.process(document)
+
+        assert document.get("copied") == "1"
+        assert document.get("copied_again") == "1"
+
     def test_process_normalized_field_already_exists_with_same_content(self):
         document = {
             "winlog": {
@@ -138,6 +160,55 @@ class TestNormalizer(BaseProcessorTestCase):
         self.object._add_field("host.user.name", "admin")
         assert self.object._conflicting_fields == ["host.user.name"]
 
+    def test_process_batch_normalizes_all_events(self):
+        documents = [
+            {
+                "winlog": {
+                    "api": "wineventlog",
+                    "event_id": 1234,
+                    "event_data": {"test_normalize": "first value"},
+                }
+            },
+            {
+                "winlog": {
+                    "api": "wineventlog",
+                    "event_id": 1234,
+                    "event_data": {"test_normalize": "second value"},
+                }
+            },
+        ]
+
+        self.object.process_batch(documents)
+
+        assert documents[0]["test_normalized"]["something"] == "first value"
+        assert documents[1]["test_normalized"]["something"] == "second value"
+
+    def test_process_batch_collects_warnings(self):
+        documents = [
+            {
+                "winlog": {
+                    "api": "wineventlog",
+                    "event_id": 1234,
+                    "event_data": {"test_normalize": "I am new and want to be normalized!"},
+                },
+                "test_normalized": {"something": "I already exist but I am different!"},
+            },
+            {
+                "winlog": {
+                    "api": "wineventlog",
+                    "event_id": 1234,
+                    "event_data": {"test_normalize": "some value"},
+                }
+            },
+        ]
+
+        with pytest.raises(ProcessingWarningCollection) as error:
+            self.object.process_batch(documents)
+
+        assert len(error.value.processing_warnings) == 1
+        assert documents[0]["test_normalized"]["something"] == "I already exist but I am different!"
+        assert documents[1]["test_normalized"]["something"] == "some value"
+
     def test_normalization_from_specific_rules(self):
         event = {
             "winlog": {
@@ -1023,6 +1094,37 @@ class TestNormalizer(BaseProcessorTestCase):
 
         assert event == expected
 
+    def test_normalization_with_grok_pattern_timeout(self):
+        self.object = Normalizer(
+            "Test Normalizer Name",
+            self.generic_rules_dirs,
+            self.generic_rules_dirs,
+            None,
+            self.logger,
+            regex_mapping=self.CONFIG["regex_mapping"],
+            html_replace_fields=self.CONFIG["html_replace_fields"],
+            grok_pattern_timeout=0.1,
+        )
+
+        event = {
+            "winlog": {
+                "api": "wineventlog",
+                "event_id": 123456789,
+                "event_data": {"normalize me!": "a" * 30},
+            }
+        }
+
+        rule = {
+            "filter": "winlog.event_id: 123456789",
+            "normalize": {
+                "winlog.event_data.normalize me!": {"grok": "(a|aa)+c%{NUMBER:port:int}"}
+            },
+        }
+
+        self._load_specific_rule(rule)
+        with pytest.raises(ProcessingWarning, match=r"Grok matching timed out"):
+            self.object.process(event)
+
     def test_normalization_with_grok_pattern_count(self):
 
         temp_path = tempfile.mkdtemp()
@@ -1034,7 +1136,13 @@ class TestNormalizer(BaseProcessorTestCase):
             self.logger,
             regex_mapping=self.CONFIG["regex_mapping"],
             html_replace_fields=self.CONFIG["html_replace_fields"],
-            count_grok_pattern_matches={"count_directory_path": temp_path, "write_period": 0},
+            count_grok_pattern_matches={
+                "count_directory_path": temp_path,
+                "write_period": 0,
+                "lock_file_path": os.path.join(
+                    tempfile.mkdtemp(), "count_grok_pattern_matches.lock"
+                ),
+            },
         )
 
         event = {
@@ -1062,8 +1170,7 @@ class TestNormalizer(BaseProcessorTestCase):
 
         assert len(match_cnt_files) == 1
 
-        now = arrow.now()
-        date = now.date()
+        date = datetime.now().date()
         match_file_name = match_cnt_files[0]
 
         assert match_file_name.endswith(".json")
@@ -1092,6 +1199,51 @@ class TestNormalizer(BaseProcessorTestCase):
         assert event.get("some_ip") == "123.123.123.123"
         assert event.get("port") == 1234
 
+    def test_normalization_with_grok_pattern_count_defers_writing_to_thread(self):
+
+        temp_path = tempfile.mkdtemp()
+        self.object = Normalizer(
+            "Test Normalizer Name",
+            self.generic_rules_dirs,
+            self.generic_rules_dirs,
+            None,
+            self.logger,
+            regex_mapping=self.CONFIG["regex_mapping"],
+            html_replace_fields=self.CONFIG["html_replace_fields"],
+            count_grok_pattern_matches={
+                "count_directory_path": temp_path,
+                "write_period": 300,
+                "lock_file_path": os.path.join(
+                    tempfile.mkdtemp(), "count_grok_pattern_matches.lock"
+                ),
+            },
+        )
+
+        event = {
+            "winlog": {
+                "api": "wineventlog",
+                "event_id": 123456789,
+                "event_data": {"normalize me!": "123.123.123.123 1234"},
+            }
+        }
+
+        rule = {
+            "filter": "winlog.event_id: 123456789",
+            "normalize": {
+                "winlog.event_data.normalize me!": {"grok": "%{IP:some_ip} %{NUMBER:port:int}"}
+            },
+        }
+
+        self._load_specific_rule(rule)
+        self.object.process(event)
+
+        assert self.object._grok_cnt_writer is not None
+        assert not os.listdir(temp_path)
+
+        self.object._write_grok_matches()
+
+        assert len(os.listdir(temp_path)) == 1
+
 
 class TestNormalizerFactory(TestNormalizer):
     def test_create(self):
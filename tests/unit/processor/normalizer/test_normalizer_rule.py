@@ -4,7 +4,7 @@ import pytest
 
 pytest.importorskip("logprep.processor.normalizer")
 
-from logprep.processor.normalizer.rule import NormalizerRule
+from logprep.processor.normalizer.rule import GrokWrapper, NormalizerRule
 
 
 @pytest.fixture()
@@ -54,3 +54,66 @@ class TestNormalizerRule:
         assert rule != rule_diff_substi
         assert rule != rule_diff_filter
         assert rule_diff_substi != rule_diff_filter
+
+    def test_grok_wrapper_combines_pattern_list_into_one_regex(self):
+        wrapper = GrokWrapper(
+            [
+                "%{IP:some_ip_1} %{NUMBER:port_1:int} foo",
+                "%{IP:some_ip_2} %{NUMBER:port_2:int} bar",
+            ]
+        )
+
+        assert wrapper._combined_regex is not None
+        matches = wrapper.match("123.123.123.123 1234 bar")
+        assert matches["some_ip_2"] == "123.123.123.123"
+        assert matches["port_2"] == 1234
+        assert matches["some_ip_1"] is None
+
+    def test_grok_wrapper_does_not_combine_alternatives_without_captures(self):
+        wrapper = GrokWrapper(["%{IP:some_ip_1} %{NUMBER:port_1:int} foo", "NO MATCH"])
+
+        assert wrapper._combined_regex is None
+
+    def test_grok_wrapper_factors_shared_prefix_out_of_combined_regex(self):
+        wrapper = GrokWrapper(
+            [
+                "ABC %{NUMBER:port_1:int} foo",
+                "ABC %{NUMBER:port_2:int} bar",
+            ]
+        )
+
+        assert wrapper._combined_regex is not None
+        assert wrapper._combined_regex.pattern.startswith("^ABC (?:")
+        matches = wrapper.match("ABC 1234 bar")
+        assert matches["port_2"] == 1234
+        assert matches["port_1"] is None
+
+    def test_grok_wrapper_does_not_factor_quantified_prefix(self):
+        combined = GrokWrapper._factor_common_prefix(["^a+b$", "^a+c$"])
+
+        assert combined == "(?:^a+b$)|(?:^a+c$)"
+
+    def test_grok_wrapper_extracts_required_literals(self):
+        wrapper = GrokWrapper(
+            [
+                "%{IP:some_ip_1} %{NUMBER:port_1:int} foo",
+                "%{IP:some_ip_2} %{NUMBER:port_2:int} bar",
+                "%{IP:some_ip_3} (%{NUMBER:port_3:int} baz)?",
+            ]
+        )
+
+        assert wrapper._required_literals == [" foo", " bar", None]
+        matches = wrapper.match("123.123.123.123 1234 bar", pattern_matches={})
+        assert matches["some_ip_2"] == "123.123.123.123"
+
+    def test_grok_wrappers_with_same_pattern_share_compiled_grok(self):
+        wrapper_1 = GrokWrapper("%{IP:some_ip} %{NUMBER:port:int}")
+        wrapper_2 = GrokWrapper(["%{IP:some_ip} %{NUMBER:port:int}"])
+
+        assert wrapper_1._grok_list[0] is wrapper_2._grok_list[0]
+
+    def test_grok_wrapper_from_patterns_returns_cached_wrapper(self):
+        wrapper_1 = GrokWrapper.from_patterns("%{IP:some_ip} %{NUMBER:port:int}")
+        wrapper_2 = GrokWrapper.from_patterns(["%{IP:some_ip} %{NUMBER:port:int}"])
+
+        assert wrapper_1 is wrapper_2
@@ -83,6 +83,19 @@ class TestWinMessageReplacer:
         assert document["dotted"].get("message")
         assert document["dotted"]["message"] == "Test %1 Test %2"
 
+    def test_replace_dotted_message_with_non_dict_parent_does_nothing(
+        self, template_replacer_dotted_field
+    ):
+        assert template_replacer_dotted_field.ps.processed_count == 0
+        document = {
+            "winlog": {"channel": "System", "provider_name": "Test", "event_id": 123},
+            "dotted": "xmessagex",
+        }
+
+        template_replacer_dotted_field.process(document)
+
+        assert document["dotted"] == "xmessagex"
+
     def test_replace_with_additional_hyphen(self, template_replacer):
         assert template_replacer.ps.processed_count == 0
         document = {